@@ -20,6 +20,10 @@ def create_app():
     db.init_app(app)
     ma.init_app(app)
     
+    # Registra o perfilador de consultas no engine do SQLAlchemy
+    from app.utils.query_profiler import query_profiler
+    query_profiler.init_app(app)
+    
     # Importa e registra os blueprints
     from app.controllers.product_controller import product_blueprint
     app.register_blueprint(product_blueprint, url_prefix='/api')
@@ -33,8 +37,21 @@ def create_app():
     from app.controllers.swagger_controller import swagger_blueprint
     app.register_blueprint(swagger_blueprint, url_prefix='/api')
     
+    # Registra o blueprint administrativo
+    from app.controllers.admin_controller import admin_blueprint
+    app.register_blueprint(admin_blueprint, url_prefix='/api')
+    
     # Cria as tabelas do banco de dados
     with app.app_context():
         db.create_all()
+        
+        # Carrega a cópia do catálogo em memória, se habilitada
+        if app.config['CATALOG_SNAPSHOT_ENABLED']:
+            from app.repositories.catalog_snapshot import catalog_snapshot
+            catalog_snapshot.load()
+    
+    # Recupera ajustes de estoque pendentes e inicia a gravação em lote, se habilitada
+    from app.services.stock_buffer import stock_buffer
+    stock_buffer.init_app(app)
     
     return app
\ No newline at end of file
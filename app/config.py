@@ -6,6 +6,26 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'minha_chave_secreta')
     DEBUG = False
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Paginação da listagem filtrada
+    PRODUCT_QUERY_DEFAULT_LIMIT = int(os.getenv('PRODUCT_QUERY_DEFAULT_LIMIT', '20'))
+    PRODUCT_QUERY_MAX_LIMIT = int(os.getenv('PRODUCT_QUERY_MAX_LIMIT', '100'))
+    PRODUCT_QUERY_MAX_OFFSET = int(os.getenv('PRODUCT_QUERY_MAX_OFFSET', '10000'))
+    # Cópia do catálogo em memória para leituras (opcional)
+    CATALOG_SNAPSHOT_ENABLED = os.getenv('CATALOG_SNAPSHOT_ENABLED', 'false').lower() == 'true'
+    CATALOG_SNAPSHOT_MAX_STALENESS = float(os.getenv('CATALOG_SNAPSHOT_MAX_STALENESS', '5'))
+    CATALOG_SNAPSHOT_FULL_RELOAD = float(os.getenv('CATALOG_SNAPSHOT_FULL_RELOAD', '300'))
+    # Gravação em lote (write-behind) dos ajustes de estoque (opcional)
+    STOCK_WRITE_BEHIND_ENABLED = os.getenv('STOCK_WRITE_BEHIND_ENABLED', 'false').lower() == 'true'
+    STOCK_FLUSH_INTERVAL = float(os.getenv('STOCK_FLUSH_INTERVAL', '0.5'))
+    STOCK_FLUSH_MAX_PENDING = int(os.getenv('STOCK_FLUSH_MAX_PENDING', '500'))
+    # Log local para recuperação após queda; obrigatório com a gravação em lote, um por processo
+    STOCK_WRITE_BEHIND_LOG = os.getenv('STOCK_WRITE_BEHIND_LOG', '')
+    # Log de consultas lentas e agregado por instrução (opcional)
+    QUERY_PROFILER_ENABLED = os.getenv('QUERY_PROFILER_ENABLED', 'false').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '100'))
+    QUERY_PROFILER_SAMPLE_RATE = float(os.getenv('QUERY_PROFILER_SAMPLE_RATE', '0.1'))
+    QUERY_PROFILER_EXPLAIN = os.getenv('QUERY_PROFILER_EXPLAIN', 'false').lower() == 'true'
+    QUERY_PROFILER_EXPLAIN_INTERVAL = float(os.getenv('QUERY_PROFILER_EXPLAIN_INTERVAL', '300'))
 
 class DevelopmentConfig(Config):
     DEBUG = True
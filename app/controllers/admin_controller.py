@@ -0,0 +1,46 @@
+from flask import Blueprint, jsonify, current_app
+from app.utils.query_profiler import query_profiler
+from app.services.stock_buffer import stock_buffer
+from typing import Dict, Any, Tuple
+
+# Cria o blueprint para as rotas administrativas
+admin_blueprint = Blueprint('admin', __name__)
+
+@admin_blueprint.route('/admin/queries', methods=['GET'])
+def get_query_stats() -> Tuple[Dict[str, Any], int]:
+    """
+    Endpoint para consultar o agregado de consultas por instrução
+    ---
+    responses:
+      200:
+        description: Chamadas amostradas, tempo total e máximo por instrução
+    """
+    return jsonify({
+        'enabled': current_app.config['QUERY_PROFILER_ENABLED'],
+        'sample_rate': query_profiler.sample_rate,
+        'slow_query_threshold_ms': query_profiler.threshold_ms,
+        'queries': query_profiler.stats()
+    }), 200
+
+@admin_blueprint.route('/admin/queries', methods=['DELETE'])
+def reset_query_stats() -> Tuple[Dict[str, Any], int]:
+    """
+    Endpoint para descartar o agregado de consultas
+    ---
+    responses:
+      204:
+        description: Agregado descartado com sucesso
+    """
+    query_profiler.reset()
+    return '', 204
+
+@admin_blueprint.route('/admin/stock-buffer', methods=['GET'])
+def get_stock_buffer_stats() -> Tuple[Dict[str, Any], int]:
+    """
+    Endpoint para consultar as métricas da gravação em lote de estoque
+    ---
+    responses:
+      200:
+        description: Pendências, tamanho dos lotes e latência das gravações
+    """
+    return jsonify(stock_buffer.stats()), 200
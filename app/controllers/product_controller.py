@@ -62,6 +62,82 @@ def get_products_by_name(name: str) -> Tuple[Dict[str, Any], int]:
     products = product_service.find_by_name(name)
     return jsonify(products), 200
 
+@product_blueprint.route('/products/prefix/<string:prefix>', methods=['GET'])
+def get_products_by_name_prefix(prefix: str) -> Tuple[Dict[str, Any], int]:
+    """
+    Endpoint para buscar produtos pelo início do nome
+    ---
+    parameters:
+      - name: prefix
+        in: path
+        type: string
+        required: true
+        description: Início do nome do produto
+    responses:
+      200:
+        description: Lista de produtos cujo nome começa com o prefixo, em ordem de nome
+    """
+    products = product_service.find_by_name_prefix(prefix)
+    return jsonify(products), 200
+
+@product_blueprint.route('/products/search', methods=['GET'])
+def search_products() -> Tuple[Dict[str, Any], int]:
+    """
+    Endpoint para listar produtos filtrados, ordenados e paginados
+    ---
+    parameters:
+      - name: category
+        in: query
+        type: string
+        required: false
+        description: Categoria do produto
+      - name: min_price
+        in: query
+        type: number
+        required: false
+        description: Preço mínimo (sem categoria, exige sort=price)
+      - name: max_price
+        in: query
+        type: number
+        required: false
+        description: Preço máximo (sem categoria, exige sort=price)
+      - name: in_stock
+        in: query
+        type: boolean
+        required: false
+        description: Apenas produtos com (true) ou sem (false) estoque
+      - name: sort
+        in: query
+        type: string
+        required: false
+        description: Campo de ordenação (id, price ou updated_at)
+      - name: order
+        in: query
+        type: string
+        required: false
+        description: Direção da ordenação (asc ou desc)
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Tamanho da página (limitado pelo máximo configurado)
+      - name: offset
+        in: query
+        type: integer
+        required: false
+        description: Posição inicial da página (limitada pelo máximo configurado)
+    responses:
+      200:
+        description: Página de produtos que atendem aos filtros
+      400:
+        description: Parâmetros inválidos
+    """
+    try:
+        page = product_service.search(request.args.to_dict())
+        return jsonify(page), 200
+    except BadRequestException as e:
+        return jsonify({'message': str(e)}), 400
+
 @product_blueprint.route('/products/count', methods=['GET'])
 def count_products() -> Tuple[Dict[str, Any], int]:
     """
@@ -74,6 +150,18 @@ def count_products() -> Tuple[Dict[str, Any], int]:
     count = product_service.count()
     return jsonify({'count': count}), 200
 
+@product_blueprint.route('/products/snapshot', methods=['GET'])
+def get_snapshot_stats() -> Tuple[Dict[str, Any], int]:
+    """
+    Endpoint para consultar a cópia do catálogo em memória
+    ---
+    responses:
+      200:
+        description: Estado, defasagem e memória por produto da cópia
+    """
+    stats = product_service.snapshot_stats()
+    return jsonify(stats), 200
+
 @product_blueprint.route('/products', methods=['POST'])
 def create_product() -> Tuple[Dict[str, Any], int]:
     """
@@ -166,6 +254,48 @@ def update_product(product_id: int) -> Tuple[Dict[str, Any], int]:
     except BadRequestException as e:
         return jsonify({'message': str(e)}), 400
 
+@product_blueprint.route('/products/<int:product_id>/stock', methods=['POST'])
+def adjust_product_stock(product_id: int) -> Tuple[Dict[str, Any], int]:
+    """
+    Endpoint para ajustar o estoque de um produto de forma relativa
+    ---
+    parameters:
+      - name: product_id
+        in: path
+        type: integer
+        required: true
+        description: ID do produto
+      - name: body
+        in: body
+        required: true
+        schema:
+          id: StockAdjustment
+          required:
+            - delta
+          properties:
+            delta:
+              type: integer
+              description: Quantidade a somar (positiva) ou subtrair (negativa) do estoque
+    responses:
+      200:
+        description: Estoque ajustado com sucesso
+      202:
+        description: Ajuste aceito para gravação em lote
+      404:
+        description: Produto não encontrado
+      400:
+        description: Dados inválidos ou estoque insuficiente
+    """
+    try:
+        adjustment_data = request.get_json()
+        result = product_service.adjust_stock(product_id, adjustment_data)
+        status = 202 if product_service.stock_buffer.enabled else 200
+        return jsonify(result), status
+    except ResourceNotFoundException as e:
+        return jsonify({'message': str(e)}), 404
+    except BadRequestException as e:
+        return jsonify({'message': str(e)}), 400
+
 @product_blueprint.route('/products/<int:product_id>', methods=['DELETE'])
 def delete_product(product_id: int) -> Tuple[Dict[str, Any], int]:
     """
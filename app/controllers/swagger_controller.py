@@ -21,6 +21,10 @@ def get_swagger():
             {
                 "name": "produtos",
                 "description": "Operações relacionadas a produtos"
+            },
+            {
+                "name": "admin",
+                "description": "Operações administrativas e de diagnóstico"
             }
         ],
         "paths": {
@@ -153,6 +157,64 @@ def get_swagger():
                     }
                 }
             },
+            "/products/{product_id}/stock": {
+                "post": {
+                    "tags": ["produtos"],
+                    "summary": "Ajusta o estoque de um produto",
+                    "description": "Soma um ajuste relativo ao estoque. Com a gravação em lote habilitada, o ajuste é enfileirado e a resposta é 202",
+                    "produces": ["application/json"],
+                    "consumes": ["application/json"],
+                    "parameters": [
+                        {
+                            "name": "product_id",
+                            "in": "path",
+                            "description": "ID do produto",
+                            "required": True,
+                            "type": "integer",
+                            "format": "int64"
+                        },
+                        {
+                            "in": "body",
+                            "name": "ajuste",
+                            "description": "Ajuste relativo do estoque",
+                            "required": True,
+                            "schema": {"$ref": "#/definitions/StockAdjustment"}
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Estoque ajustado com sucesso",
+                            "schema": {"$ref": "#/definitions/Product"}
+                        },
+                        "202": {
+                            "description": "Ajuste aceito para gravação em lote",
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "id": {
+                                        "type": "integer",
+                                        "description": "ID do produto"
+                                    },
+                                    "pending_delta": {
+                                        "type": "integer",
+                                        "description": "Soma dos ajustes ainda não gravados"
+                                    },
+                                    "expected_stock": {
+                                        "type": "integer",
+                                        "description": "Estoque esperado após a gravação"
+                                    }
+                                }
+                            }
+                        },
+                        "400": {
+                            "description": "Dados inválidos ou estoque insuficiente"
+                        },
+                        "404": {
+                            "description": "Produto não encontrado"
+                        }
+                    }
+                }
+            },
             "/products/name/{name}": {
                 "get": {
                     "tags": ["produtos"],
@@ -179,6 +241,134 @@ def get_swagger():
                     }
                 }
             },
+            "/products/prefix/{prefix}": {
+                "get": {
+                    "tags": ["produtos"],
+                    "summary": "Busca produtos por prefixo do nome",
+                    "description": "Retorna produtos cujo nome começa com o prefixo especificado, em ordem de nome",
+                    "produces": ["application/json"],
+                    "parameters": [
+                        {
+                            "name": "prefix",
+                            "in": "path",
+                            "description": "Início do nome do produto (sem diferenciar maiúsculas)",
+                            "required": True,
+                            "type": "string"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Lista de produtos encontrados",
+                            "schema": {
+                                "type": "array",
+                                "items": {"$ref": "#/definitions/Product"}
+                            }
+                        }
+                    }
+                }
+            },
+            "/products/search": {
+                "get": {
+                    "tags": ["produtos"],
+                    "summary": "Lista produtos filtrados",
+                    "description": "Retorna produtos filtrados por categoria, faixa de preço e estoque, ordenados por um campo indexado e paginados",
+                    "produces": ["application/json"],
+                    "parameters": [
+                        {
+                            "name": "category",
+                            "in": "query",
+                            "description": "Categoria do produto",
+                            "required": False,
+                            "type": "string"
+                        },
+                        {
+                            "name": "min_price",
+                            "in": "query",
+                            "description": "Preço mínimo (sem categoria, exige sort=price)",
+                            "required": False,
+                            "type": "number",
+                            "format": "float"
+                        },
+                        {
+                            "name": "max_price",
+                            "in": "query",
+                            "description": "Preço máximo (sem categoria, exige sort=price)",
+                            "required": False,
+                            "type": "number",
+                            "format": "float"
+                        },
+                        {
+                            "name": "in_stock",
+                            "in": "query",
+                            "description": "Apenas produtos com (true) ou sem (false) estoque",
+                            "required": False,
+                            "type": "boolean"
+                        },
+                        {
+                            "name": "sort",
+                            "in": "query",
+                            "description": "Campo de ordenação",
+                            "required": False,
+                            "type": "string",
+                            "enum": ["id", "price", "updated_at"],
+                            "default": "id"
+                        },
+                        {
+                            "name": "order",
+                            "in": "query",
+                            "description": "Direção da ordenação",
+                            "required": False,
+                            "type": "string",
+                            "enum": ["asc", "desc"],
+                            "default": "asc"
+                        },
+                        {
+                            "name": "limit",
+                            "in": "query",
+                            "description": "Tamanho da página (limitado pelo máximo configurado)",
+                            "required": False,
+                            "type": "integer"
+                        },
+                        {
+                            "name": "offset",
+                            "in": "query",
+                            "description": "Posição inicial da página (limitada pelo máximo configurado)",
+                            "required": False,
+                            "type": "integer",
+                            "default": 0
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Página de produtos retornada com sucesso",
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "items": {
+                                        "type": "array",
+                                        "items": {"$ref": "#/definitions/Product"}
+                                    },
+                                    "limit": {
+                                        "type": "integer",
+                                        "description": "Tamanho da página aplicado"
+                                    },
+                                    "offset": {
+                                        "type": "integer",
+                                        "description": "Posição inicial da página"
+                                    },
+                                    "next_offset": {
+                                        "type": "integer",
+                                        "description": "Posição da próxima página, ou nulo se não houver"
+                                    }
+                                }
+                            }
+                        },
+                        "400": {
+                            "description": "Parâmetros inválidos"
+                        }
+                    }
+                }
+            },
             "/products/count": {
                 "get": {
                     "tags": ["produtos"],
@@ -200,6 +390,142 @@ def get_swagger():
                         }
                     }
                 }
+            },
+            "/products/snapshot": {
+                "get": {
+                    "tags": ["produtos"],
+                    "summary": "Consulta a cópia do catálogo em memória",
+                    "description": "Retorna o estado, a defasagem e a memória por produto da cópia em memória",
+                    "produces": ["application/json"],
+                    "responses": {
+                        "200": {
+                            "description": "Estatísticas retornadas com sucesso",
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "enabled": {
+                                        "type": "boolean",
+                                        "description": "Indica se a cópia em memória está habilitada"
+                                    },
+                                    "products": {
+                                        "type": "integer",
+                                        "description": "Número de produtos na cópia"
+                                    },
+                                    "total_bytes": {
+                                        "type": "integer",
+                                        "description": "Memória estimada da cópia e dos índices"
+                                    },
+                                    "bytes_per_product": {
+                                        "type": "integer",
+                                        "description": "Memória estimada por produto"
+                                    },
+                                    "max_staleness_seconds": {
+                                        "type": "number",
+                                        "description": "Defasagem máxima configurada"
+                                    },
+                                    "seconds_since_refresh": {
+                                        "type": "number",
+                                        "description": "Tempo desde a última atualização"
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            },
+            "/admin/queries": {
+                "get": {
+                    "tags": ["admin"],
+                    "summary": "Consulta o agregado de consultas",
+                    "description": "Retorna, por instrução normalizada, as chamadas amostradas, o tempo total, o tempo máximo e o número de execuções lentas",
+                    "produces": ["application/json"],
+                    "responses": {
+                        "200": {
+                            "description": "Agregado retornado com sucesso",
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "enabled": {
+                                        "type": "boolean",
+                                        "description": "Indica se o perfilador está habilitado"
+                                    },
+                                    "sample_rate": {
+                                        "type": "number",
+                                        "description": "Fração das instruções incluídas no agregado"
+                                    },
+                                    "slow_query_threshold_ms": {
+                                        "type": "number",
+                                        "description": "Limite para registrar uma consulta como lenta"
+                                    },
+                                    "queries": {
+                                        "type": "array",
+                                        "items": {"$ref": "#/definitions/QueryStats"}
+                                    }
+                                }
+                            }
+                        }
+                    }
+                },
+                "delete": {
+                    "tags": ["admin"],
+                    "summary": "Descarta o agregado de consultas",
+                    "description": "Zera o agregado acumulado pelo perfilador",
+                    "responses": {
+                        "204": {
+                            "description": "Agregado descartado com sucesso"
+                        }
+                    }
+                }
+            },
+            "/admin/stock-buffer": {
+                "get": {
+                    "tags": ["admin"],
+                    "summary": "Consulta a gravação em lote de estoque",
+                    "description": "Retorna os ajustes pendentes, o tamanho dos lotes e a latência das gravações",
+                    "produces": ["application/json"],
+                    "responses": {
+                        "200": {
+                            "description": "Métricas retornadas com sucesso",
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "enabled": {
+                                        "type": "boolean",
+                                        "description": "Indica se a gravação em lote está habilitada"
+                                    },
+                                    "pending_deltas": {
+                                        "type": "integer",
+                                        "description": "Ajustes aguardando gravação"
+                                    },
+                                    "flushes": {
+                                        "type": "integer",
+                                        "description": "Lotes gravados"
+                                    },
+                                    "avg_batch_size": {
+                                        "type": "number",
+                                        "description": "Produtos por lote, em média"
+                                    },
+                                    "max_batch_size": {
+                                        "type": "integer",
+                                        "description": "Maior lote gravado"
+                                    },
+                                    "avg_flush_ms": {
+                                        "type": "number",
+                                        "description": "Latência média da gravação"
+                                    },
+                                    "max_flush_ms": {
+                                        "type": "number",
+                                        "description": "Maior latência de gravação"
+                                    },
+                                    "rows_rejected": {
+                                        "type": "integer",
+                                        "description": "Ajustes recusados pelo banco por estoque insuficiente"
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
             }
         },
         "definitions": {
@@ -272,6 +598,46 @@ def get_swagger():
                         "description": "Categoria do produto"
                     }
                 }
+            },
+            "StockAdjustment": {
+                "type": "object",
+                "required": ["delta"],
+                "properties": {
+                    "delta": {
+                        "type": "integer",
+                        "format": "int32",
+                        "description": "Quantidade a somar (positiva) ou subtrair (negativa) do estoque"
+                    }
+                }
+            },
+            "QueryStats": {
+                "type": "object",
+                "properties": {
+                    "fingerprint": {
+                        "type": "string",
+                        "description": "Instrução SQL normalizada"
+                    },
+                    "calls": {
+                        "type": "integer",
+                        "description": "Chamadas amostradas"
+                    },
+                    "total_ms": {
+                        "type": "number",
+                        "description": "Tempo total das chamadas amostradas"
+                    },
+                    "avg_ms": {
+                        "type": "number",
+                        "description": "Tempo médio das chamadas amostradas"
+                    },
+                    "max_ms": {
+                        "type": "number",
+                        "description": "Maior tempo observado"
+                    },
+                    "slow_calls": {
+                        "type": "integer",
+                        "description": "Execuções acima do limite de consulta lenta"
+                    }
+                }
             }
         }
     })
\ No newline at end of file
@@ -1,6 +1,6 @@
 from app import ma
 from app.models.product import Product
-from marshmallow import fields
+from marshmallow import Schema, ValidationError, fields, validate, validates_schema
 
 class ProductSchema(ma.SQLAlchemySchema):
     class Meta:
@@ -15,6 +15,35 @@ class ProductSchema(ma.SQLAlchemySchema):
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
 
+# Campos que podem ser usados na ordenação da listagem
+SORTABLE_FIELDS = ['id', 'price', 'updated_at']
+
+class ProductQuerySchema(Schema):
+    """Parâmetros da listagem filtrada de produtos."""
+    category = fields.String()
+    min_price = fields.Float(validate=validate.Range(min=0))
+    max_price = fields.Float(validate=validate.Range(min=0))
+    in_stock = fields.Boolean()
+    sort = fields.String(load_default='id', validate=validate.OneOf(SORTABLE_FIELDS))
+    order = fields.String(load_default='asc', validate=validate.OneOf(['asc', 'desc']))
+    limit = fields.Integer(validate=validate.Range(min=1))
+    offset = fields.Integer(load_default=0, validate=validate.Range(min=0))
+    
+    @validates_schema
+    def validate_indexed_shape(self, data, **kwargs):
+        # Sem categoria, a faixa de preço só é atendida pelo índice (price, id)
+        # se a ordenação também for por preço; as demais exigiriam ordenar a faixa inteira
+        has_price_range = 'min_price' in data or 'max_price' in data
+        if has_price_range and 'category' not in data and data.get('sort') != 'price':
+            raise ValidationError('Filtro por faixa de preço sem categoria exige sort=price', 'sort')
+
+class StockAdjustmentSchema(Schema):
+    """Ajuste relativo da quantidade em estoque."""
+    delta = fields.Integer(required=True, strict=True, validate=validate.And(
+        validate.Range(min=-1000000, max=1000000), validate.NoneOf([0])))
+
 # Inicializa os esquemas
 product_schema = ProductSchema()
 products_schema = ProductSchema(many=True)
+product_query_schema = ProductQuerySchema()
+stock_adjustment_schema = StockAdjustmentSchema()
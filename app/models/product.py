@@ -3,6 +3,15 @@ from datetime import datetime
 
 class Product(db.Model):
     __tablename__ = 'products'
+    __table_args__ = (
+        # Índices que sustentam os filtros e ordenações da listagem, sempre
+        # terminando no id, que desempata a ordenação
+        db.Index('ix_products_price_id', 'price', 'id'),
+        db.Index('ix_products_updated_at_id', 'updated_at', 'id'),
+        db.Index('ix_products_category_id', 'category', 'id'),
+        db.Index('ix_products_category_price_id', 'category', 'price', 'id'),
+        db.Index('ix_products_category_updated_at_id', 'category', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -0,0 +1,13 @@
+from app import db
+from datetime import datetime
+
+class StockDeltaBatch(db.Model):
+    """Lote de ajustes de estoque já aplicado, usado para evitar reaplicação na recuperação."""
+    __tablename__ = 'stock_delta_batches'
+    
+    batch_id = db.Column(db.String(32), primary_key=True)
+    applied_at = db.Column(db.DateTime, default=datetime.now)
+    
+    def __init__(self, batch_id):
+        self.batch_id = batch_id
+        self.applied_at = datetime.now()
@@ -0,0 +1,307 @@
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from app.models.product import Product
+
+# Campos com índice ordenado, os mesmos aceitos na ordenação da listagem
+SORT_KEYS = ('id', 'price', 'updated_at')
+
+
+class CatalogEntry:
+    """Registro compacto de um produto mantido em memória."""
+
+    __slots__ = ('id', 'name', 'description', 'price', 'stock_quantity',
+                 'category', 'created_at', 'updated_at')
+
+    def __init__(self, product: Product):
+        self.id = product.id
+        self.name = product.name
+        self.description = product.description
+        self.price = product.price
+        self.stock_quantity = product.stock_quantity
+        self.category = product.category
+        self.created_at = product.created_at
+        self.updated_at = product.updated_at
+
+
+class CatalogSnapshot:
+    """
+    Cópia em memória do catálogo para leituras sem acesso ao banco.
+
+    Mantém um hash por id e listas ordenadas por id, preço e `updated_at`,
+    repetidas por categoria, além de um índice ordenado por nome (em
+    minúsculas) para a busca por prefixo. As consultas percorrem o índice
+    correspondente à ordenação pedida e param ao completar a página. A cópia
+    é carregada por completo no boot e atualizada incrementalmente consultando
+    `updated_at` sempre que fica mais velha que
+    `CATALOG_SNAPSHOT_MAX_STALENESS` segundos. Exclusões feitas por outros
+    processos são detectadas pela divergência na contagem ou pela recarga
+    completa a cada `CATALOG_SNAPSHOT_FULL_RELOAD` segundos.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._loaded = False
+        self._by_id: Dict[int, CatalogEntry] = {}
+        self._indexes: Dict[str, List[Any]] = self._empty_indexes()
+        self._by_category: Dict[Optional[str], Dict[str, List[Any]]] = {}
+        self._name_index: List[Tuple[str, int]] = []
+        self._watermark: Optional[datetime] = None
+        self._last_refresh = 0.0
+        self._last_full_load = 0.0
+
+    def load(self) -> None:
+        """Carrega o catálogo completo e reconstrói os índices."""
+        products = Product.query.order_by(Product.id).all()
+        with self._lock:
+            self._by_id = {}
+            self._indexes = self._empty_indexes()
+            self._by_category = {}
+            self._name_index = []
+            self._watermark = None
+            for product in products:
+                entry = CatalogEntry(product)
+                self._add(entry)
+                for indexes in (self._indexes, self._category_indexes(entry.category)):
+                    for sort, index in indexes.items():
+                        index.append(self._index_key(entry, sort))
+                self._name_index.append(self._name_key(entry))
+            for indexes in (self._indexes, *self._by_category.values()):
+                for index in indexes.values():
+                    index.sort()
+            self._name_index.sort()
+            now = time.monotonic()
+            self._last_refresh = now
+            self._last_full_load = now
+            self._loaded = True
+
+    def refresh(self, overlap: float = 0.0) -> None:
+        """
+        Aplica os produtos alterados desde a última atualização. O `updated_at`
+        é definido antes do commit, então a consulta recua `overlap` segundos
+        para incluir linhas confirmadas com um horário anterior à marca d'água.
+        """
+        query = Product.query
+        if self._watermark is not None:
+            query = query.filter(Product.updated_at >= self._watermark - timedelta(seconds=overlap))
+        changed = query.order_by(Product.id).all()
+        total = Product.query.count()
+        with self._lock:
+            for product in changed:
+                self.upsert(product)
+            self._last_refresh = time.monotonic()
+            in_sync = total == len(self._by_id)
+        if not in_sync:
+            self.load()
+
+    def ensure_fresh(self) -> None:
+        """
+        Garante que a cópia respeita o limite de defasagem configurado. Apenas
+        uma thread atualiza por vez; as demais continuam servindo a cópia atual.
+        """
+        config = current_app.config
+        if not self._needs_load(config) and not self._needs_refresh(config):
+            return
+        # Sem cópia carregada não há o que servir, então a primeira carga é aguardada
+        if not self._refresh_lock.acquire(blocking=not self._loaded):
+            return
+        try:
+            if self._needs_load(config):
+                self.load()
+            elif self._needs_refresh(config):
+                self.refresh(overlap=config['CATALOG_SNAPSHOT_MAX_STALENESS'])
+        finally:
+            self._refresh_lock.release()
+
+    def upsert(self, product: Product) -> None:
+        """Insere ou substitui um produto na cópia em memória."""
+        with self._lock:
+            previous = self._by_id.get(product.id)
+            if previous is not None:
+                self._unindex(previous)
+            entry = CatalogEntry(product)
+            self._add(entry)
+            for indexes in (self._indexes, self._category_indexes(entry.category)):
+                for sort, index in indexes.items():
+                    insort(index, self._index_key(entry, sort))
+            insort(self._name_index, self._name_key(entry))
+
+    def remove(self, product_id: int) -> None:
+        """Remove um produto da cópia em memória."""
+        with self._lock:
+            entry = self._by_id.pop(product_id, None)
+            if entry is not None:
+                self._unindex(entry)
+
+    def get(self, product_id: int) -> Optional[CatalogEntry]:
+        """Busca um produto pelo ID."""
+        return self._by_id.get(product_id)
+
+    def find_all(self) -> List[CatalogEntry]:
+        """Retorna todos os produtos ordenados por ID."""
+        with self._lock:
+            return [self._by_id[product_id] for product_id in self._indexes['id']]
+
+    def find_by_name(self, name: str) -> List[CatalogEntry]:
+        """Busca produtos pelo nome (parcial, sem diferenciar maiúsculas)."""
+        # Assim como o ILIKE '%termo%' no banco, a busca por trecho percorre todo o catálogo
+        term = name.lower()
+        with self._lock:
+            return [self._by_id[product_id] for product_id in self._indexes['id']
+                    if term in (self._by_id[product_id].name or '').lower()]
+
+    def find_by_name_prefix(self, prefix: str) -> List[CatalogEntry]:
+        """Busca produtos cujo nome começa com o prefixo informado, em ordem de nome."""
+        term = prefix.lower()
+        with self._lock:
+            matches = []
+            for position in range(bisect_left(self._name_index, (term,)), len(self._name_index)):
+                key, product_id = self._name_index[position]
+                if not key.startswith(term):
+                    break
+                matches.append(self._by_id[product_id])
+            return matches
+
+    def find_by_filters(self, category: Optional[str] = None, min_price: Optional[float] = None,
+                        max_price: Optional[float] = None, in_stock: Optional[bool] = None,
+                        sort: str = 'id', descending: bool = False,
+                        limit: int = 20, offset: int = 0) -> List[CatalogEntry]:
+        """
+        Equivalente em memória de `ProductRepository.find_by_filters`. Percorre
+        o índice da ordenação pedida (da categoria, se informada) e para assim
+        que a página está completa.
+        """
+        with self._lock:
+            indexes = self._indexes if category is None else self._by_category.get(category)
+            if indexes is None:
+                return []
+            index = indexes[sort]
+            start, end = 0, len(index)
+            # Ordenado por preço, a faixa vira um intervalo do índice
+            price_in_index = sort == 'price'
+            if price_in_index and min_price is not None:
+                start = bisect_left(index, (min_price,))
+            if price_in_index and max_price is not None:
+                end = bisect_right(index, (max_price, float('inf')))
+            positions = range(end - 1, start - 1, -1) if descending else range(start, end)
+
+            filter_price = not price_in_index and (min_price is not None or max_price is not None)
+            if in_stock is None and not filter_price:
+                return [self._by_id[self._entry_id(index[position], sort)]
+                        for position in positions[offset:offset + limit]]
+
+            page: List[CatalogEntry] = []
+            skipped = 0
+            for position in positions:
+                entry = self._by_id[self._entry_id(index[position], sort)]
+                if filter_price and ((min_price is not None and entry.price < min_price)
+                                     or (max_price is not None and entry.price > max_price)):
+                    continue
+                if in_stock is not None and ((entry.stock_quantity or 0) > 0) != in_stock:
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                page.append(entry)
+                if len(page) == limit:
+                    break
+            return page
+
+    def count(self) -> int:
+        """Retorna o número total de produtos."""
+        return len(self._by_id)
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """Estima a memória ocupada pela cópia e pelos índices."""
+        with self._lock:
+            entries = 0
+            for entry in self._by_id.values():
+                entries += sys.getsizeof(entry)
+                entries += sum(sys.getsizeof(getattr(entry, slot)) for slot in CatalogEntry.__slots__)
+            indexes = sys.getsizeof(self._by_id) + sys.getsizeof(self._by_category)
+            for index in self._all_indexes():
+                indexes += sys.getsizeof(index)
+                # Ids e valores já são contados nas entradas; aqui entram as tuplas
+                indexes += sum(sys.getsizeof(item) for item in index if isinstance(item, tuple))
+            products = len(self._by_id)
+            total = entries + indexes
+            return {
+                'products': products,
+                'entries_bytes': entries,
+                'indexes_bytes': indexes,
+                'total_bytes': total,
+                'bytes_per_product': total // products if products else 0,
+                'max_staleness_seconds': current_app.config['CATALOG_SNAPSHOT_MAX_STALENESS'],
+                'seconds_since_refresh': round(time.monotonic() - self._last_refresh, 3) if self._loaded else None,
+            }
+
+    def _needs_load(self, config) -> bool:
+        return not self._loaded or time.monotonic() - self._last_full_load > config['CATALOG_SNAPSHOT_FULL_RELOAD']
+
+    def _needs_refresh(self, config) -> bool:
+        return time.monotonic() - self._last_refresh > config['CATALOG_SNAPSHOT_MAX_STALENESS']
+
+    @staticmethod
+    def _empty_indexes() -> Dict[str, List[Any]]:
+        return {sort: [] for sort in SORT_KEYS}
+
+    @staticmethod
+    def _index_key(entry: CatalogEntry, sort: str) -> Any:
+        # O índice por id guarda apenas o id; os demais, (valor, id), que desempata a ordem
+        if sort == 'id':
+            return entry.id
+        value = getattr(entry, sort)
+        if value is None and sort == 'updated_at':
+            value = datetime.min
+        return (value, entry.id)
+
+    @staticmethod
+    def _entry_id(key: Any, sort: str) -> int:
+        return key if sort == 'id' else key[1]
+
+    @staticmethod
+    def _name_key(entry: CatalogEntry) -> Tuple[str, int]:
+        return ((entry.name or '').lower(), entry.id)
+
+    def _category_indexes(self, category: Optional[str]) -> Dict[str, List[Any]]:
+        indexes = self._by_category.get(category)
+        if indexes is None:
+            indexes = self._by_category[category] = self._empty_indexes()
+        return indexes
+
+    def _all_indexes(self) -> List[List[Any]]:
+        indexes = list(self._indexes.values()) + [self._name_index]
+        for category_indexes in self._by_category.values():
+            indexes.extend(category_indexes.values())
+        return indexes
+
+    def _add(self, entry: CatalogEntry) -> None:
+        # Os índices ordenados são mantidos pelo chamador (sort em lote ou insort)
+        self._by_id[entry.id] = entry
+        if entry.updated_at is not None and (self._watermark is None or entry.updated_at > self._watermark):
+            self._watermark = entry.updated_at
+
+    def _unindex(self, entry: CatalogEntry) -> None:
+        category_indexes = self._by_category.get(entry.category)
+        for indexes in (self._indexes, category_indexes or {}):
+            for sort, index in indexes.items():
+                self._discard(index, self._index_key(entry, sort))
+        if category_indexes is not None and not category_indexes['id']:
+            del self._by_category[entry.category]
+        self._discard(self._name_index, self._name_key(entry))
+
+    @staticmethod
+    def _discard(index: List[Any], key: Any) -> None:
+        position = bisect_left(index, key)
+        if position < len(index) and index[position] == key:
+            del index[position]
+
+
+# Instância compartilhada pela aplicação
+catalog_snapshot = CatalogSnapshot()
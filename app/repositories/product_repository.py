@@ -1,7 +1,19 @@
 from app import db
 from app.models.product import Product
+from app.models.stock_delta_batch import StockDeltaBatch
 from app.utils.exceptions import ResourceNotFoundException
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+# Colunas correspondentes aos campos de ordenação aceitos pela listagem (todos indexados)
+SORT_COLUMNS = {
+    'id': Product.id,
+    'price': Product.price,
+    'updated_at': Product.updated_at,
+}
+
+# Maior valor aceito pela coluna inteira de estoque
+MAX_STOCK_QUANTITY = 2 ** 31 - 1
 
 class ProductRepository:
     def find_all(self) -> List[Product]:
@@ -19,6 +31,37 @@ class ProductRepository:
         """Busca produtos pelo nome (parcial)."""
         return Product.query.filter(Product.name.ilike(f'%{name}%')).all()
     
+    def find_by_name_prefix(self, prefix: str) -> List[Product]:
+        """Busca produtos cujo nome começa com o prefixo informado, em ordem de nome."""
+        # Escapa os curingas do LIKE para que o prefixo seja comparado literalmente
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return (Product.query.filter(Product.name.ilike(f'{escaped}%', escape='\\'))
+                .order_by(db.func.lower(Product.name), Product.id).all())
+    
+    def find_by_filters(self, category: Optional[str] = None, min_price: Optional[float] = None,
+                        max_price: Optional[float] = None, in_stock: Optional[bool] = None,
+                        sort: str = 'id', descending: bool = False,
+                        limit: int = 20, offset: int = 0) -> List[Product]:
+        """Busca produtos por categoria, faixa de preço e estoque, ordenados e paginados."""
+        query = Product.query
+        if category is not None:
+            query = query.filter(Product.category == category)
+        if min_price is not None:
+            query = query.filter(Product.price >= min_price)
+        if max_price is not None:
+            query = query.filter(Product.price <= max_price)
+        if in_stock is True:
+            query = query.filter(Product.stock_quantity > 0)
+        elif in_stock is False:
+            query = query.filter(db.or_(Product.stock_quantity <= 0, Product.stock_quantity.is_(None)))
+        
+        # O id desempata a ordenação para que a paginação seja estável
+        columns = [SORT_COLUMNS[sort]]
+        if sort != 'id':
+            columns.append(Product.id)
+        query = query.order_by(*(column.desc() if descending else column.asc() for column in columns))
+        return query.limit(limit).offset(offset).all()
+    
     def save(self, product: Product) -> Product:
         """Salva um produto."""
         db.session.add(product)
@@ -36,6 +79,61 @@ class ProductRepository:
         db.session.delete(product)
         db.session.commit()
     
+    def get_stock(self, product_id: int) -> int:
+        """Retorna apenas a quantidade em estoque de um produto."""
+        row = db.session.query(Product.stock_quantity).filter(Product.id == product_id).first()
+        if row is None:
+            raise ResourceNotFoundException(f"Produto não encontrado com id: {product_id}")
+        return row.stock_quantity or 0
+    
+    def adjust_stock(self, product_id: int, delta: int) -> bool:
+        """
+        Soma `delta` ao estoque em um único UPDATE atômico. Retorna False se o
+        ajuste deixaria o estoque negativo ou se o produto não existe.
+        """
+        updated = self._adjust_stock(product_id, delta, datetime.now())
+        db.session.commit()
+        return updated
+    
+    def apply_stock_deltas(self, batch_id: str, adjustments: List[Tuple[int, int]],
+                           forget: Iterable[str] = ()) -> Optional[List[Tuple[int, int]]]:
+        """
+        Aplica um lote de ajustes `(id, delta)`, na ordem recebida, em uma única
+        transação e registra o lote como aplicado. O chamador deve ordenar os
+        ajustes pelo ID para que transações concorrentes travem as linhas na
+        mesma ordem. Retorna os ajustes recusados (estoque negativo, acima do
+        máximo ou produto inexistente), ou None se o lote já havia sido
+        aplicado. Os registros de lotes em `forget` são descartados.
+        """
+        try:
+            if db.session.get(StockDeltaBatch, batch_id) is not None:
+                return None
+            
+            now = datetime.now()
+            rejected = [(product_id, delta) for product_id, delta in adjustments
+                        if not self._adjust_stock(product_id, delta, now)]
+            
+            forget = list(forget)
+            if forget:
+                StockDeltaBatch.query.filter(StockDeltaBatch.batch_id.in_(forget)).delete(synchronize_session=False)
+            db.session.add(StockDeltaBatch(batch_id))
+            db.session.commit()
+            return rejected
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def _adjust_stock(self, product_id: int, delta: int, now: datetime) -> bool:
+        stock = db.func.coalesce(Product.stock_quantity, 0)
+        # A verificação usa BigInteger para que a soma não estoure a coluna inteira
+        expected = db.cast(stock, db.BigInteger) + delta
+        result = db.session.execute(
+            db.update(Product)
+            .where(Product.id == product_id, expected >= 0, expected <= MAX_STOCK_QUANTITY)
+            .values(stock_quantity=stock + delta, updated_at=now)
+        )
+        return result.rowcount > 0
+    
     def count(self) -> int:
         """Retorna o número total de produtos."""
         return Product.query.count()
@@ -1,28 +1,94 @@
+from flask import current_app
 from app.repositories.product_repository import ProductRepository
+from app.repositories.catalog_snapshot import catalog_snapshot
+from app.services.stock_buffer import stock_buffer
 from app.models.product import Product
-from app.dto.product_dto import product_schema, products_schema
+from app.dto.product_dto import product_schema, products_schema, product_query_schema, stock_adjustment_schema
 from app.utils.exceptions import ResourceNotFoundException, BadRequestException
 from typing import List, Dict, Any
 
 class ProductService:
     def __init__(self):
         self.repository = ProductRepository()
+        self.snapshot = catalog_snapshot
+        self.stock_buffer = stock_buffer
+    
+    def _snapshot_enabled(self) -> bool:
+        """Indica se as leituras devem ser atendidas pela cópia em memória."""
+        if not current_app.config['CATALOG_SNAPSHOT_ENABLED']:
+            return False
+        self.snapshot.ensure_fresh()
+        return True
     
     def find_all(self) -> List[Dict[str, Any]]:
         """Retorna todos os produtos."""
+        if self._snapshot_enabled():
+            return products_schema.dump(self.snapshot.find_all())
         products = self.repository.find_all()
         return products_schema.dump(products)
     
     def find_by_id(self, product_id: int) -> Dict[str, Any]:
         """Busca um produto pelo ID."""
+        if self._snapshot_enabled():
+            entry = self.snapshot.get(product_id)
+            if entry is not None:
+                return product_schema.dump(entry)
         product = self.repository.find_by_id(product_id)
         return product_schema.dump(product)
     
     def find_by_name(self, name: str) -> List[Dict[str, Any]]:
         """Busca produtos pelo nome (parcial)."""
+        if self._snapshot_enabled():
+            return products_schema.dump(self.snapshot.find_by_name(name))
         products = self.repository.find_by_name(name)
         return products_schema.dump(products)
     
+    def find_by_name_prefix(self, prefix: str) -> List[Dict[str, Any]]:
+        """Busca produtos cujo nome começa com o prefixo informado."""
+        if self._snapshot_enabled():
+            return products_schema.dump(self.snapshot.find_by_name_prefix(prefix))
+        products = self.repository.find_by_name_prefix(prefix)
+        return products_schema.dump(products)
+    
+    def search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Lista produtos filtrados por categoria, preço e estoque, ordenados e paginados."""
+        try:
+            filters = product_query_schema.load(params)
+        except Exception as e:
+            raise BadRequestException(str(e))
+        
+        min_price, max_price = filters.get('min_price'), filters.get('max_price')
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise BadRequestException('min_price não pode ser maior que max_price')
+        
+        # Limita o tamanho e a posição da página para evitar leituras extensas,
+        # já que o banco percorre o índice até o offset
+        config = current_app.config
+        limit = min(filters.get('limit', config['PRODUCT_QUERY_DEFAULT_LIMIT']), config['PRODUCT_QUERY_MAX_LIMIT'])
+        offset = filters['offset']
+        if offset > config['PRODUCT_QUERY_MAX_OFFSET']:
+            raise BadRequestException(f"offset não pode ser maior que {config['PRODUCT_QUERY_MAX_OFFSET']}")
+        
+        # Busca um item a mais para saber se existe uma próxima página
+        source = self.snapshot if self._snapshot_enabled() else self.repository
+        products = source.find_by_filters(
+            category=filters.get('category'),
+            min_price=min_price,
+            max_price=max_price,
+            in_stock=filters.get('in_stock'),
+            sort=filters['sort'],
+            descending=filters['order'] == 'desc',
+            limit=limit + 1,
+            offset=offset
+        )
+        has_more = len(products) > limit
+        return {
+            'items': products_schema.dump(products[:limit]),
+            'limit': limit,
+            'offset': offset,
+            'next_offset': offset + limit if has_more else None
+        }
+    
     def create(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria um novo produto."""
         try:
@@ -40,12 +106,18 @@ class ProductService:
             
             # Salva o produto
             saved_product = self.repository.save(product)
+            if current_app.config['CATALOG_SNAPSHOT_ENABLED']:
+                self.snapshot.upsert(saved_product)
             return product_schema.dump(saved_product)
         except Exception as e:
             raise BadRequestException(str(e))
     
     def update(self, product_id: int, product_data: Dict[str, Any]) -> Dict[str, Any]:
         """Atualiza um produto existente."""
+        # Grava os ajustes pendentes antes de sobrescrever o estoque
+        if self.stock_buffer.enabled and 'stock_quantity' in (product_data or {}):
+            self.stock_buffer.flush()
+        
         try:
             # Busca o produto existente
             existing_product = self.repository.find_by_id(product_id)
@@ -67,16 +139,55 @@ class ProductService:
             
             # Salva as alterações
             updated_product = self.repository.update(existing_product)
+            if current_app.config['CATALOG_SNAPSHOT_ENABLED']:
+                self.snapshot.upsert(updated_product)
+            if self.stock_buffer.enabled:
+                self.stock_buffer.forget(product_id)
             return product_schema.dump(updated_product)
         except ResourceNotFoundException as e:
             raise e
         except Exception as e:
             raise BadRequestException(str(e))
     
+    def adjust_stock(self, product_id: int, adjustment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Soma um ajuste relativo ao estoque de um produto. Com a gravação em
+        lote habilitada, o ajuste é apenas enfileirado e o resultado traz o
+        estoque esperado após a próxima gravação.
+        """
+        try:
+            delta = stock_adjustment_schema.load(adjustment_data)['delta']
+        except Exception as e:
+            raise BadRequestException(str(e))
+        
+        if self.stock_buffer.enabled:
+            return self.stock_buffer.add(product_id, delta)
+        
+        if not self.repository.adjust_stock(product_id, delta):
+            # Diferencia produto inexistente de ajuste recusado
+            self.repository.find_by_id(product_id)
+            raise BadRequestException(
+                f"Ajuste recusado para o produto com id: {product_id}; o estoque ficaria negativo ou acima do máximo"
+            )
+        product = self.repository.find_by_id(product_id)
+        if current_app.config['CATALOG_SNAPSHOT_ENABLED']:
+            self.snapshot.upsert(product)
+        return product_schema.dump(product)
+    
     def delete(self, product_id: int) -> None:
         """Remove um produto pelo ID."""
         self.repository.delete(product_id)
+        if current_app.config['CATALOG_SNAPSHOT_ENABLED']:
+            self.snapshot.remove(product_id)
     
     def count(self) -> int:
         """Retorna o número total de produtos."""
-        return self.repository.count()
\ No newline at end of file
+        if self._snapshot_enabled():
+            return self.snapshot.count()
+        return self.repository.count()
+    
+    def snapshot_stats(self) -> Dict[str, Any]:
+        """Retorna o estado e o consumo de memória da cópia do catálogo."""
+        if not self._snapshot_enabled():
+            return {'enabled': False}
+        return {'enabled': True, **self.snapshot.memory_stats()}
\ No newline at end of file
@@ -0,0 +1,331 @@
+import atexit
+import glob
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from app.repositories.product_repository import ProductRepository, MAX_STOCK_QUANTITY
+from app.utils.exceptions import BadRequestException
+
+logger = logging.getLogger(__name__)
+
+# Arquivos de lote gerados pela rotação do log: `<log>.<id do lote>`
+_BATCH_SUFFIX = re.compile(r'\.([0-9a-f]{32})$')
+
+# Ajustes pendentes de um produto: [reposições, vendas]
+Batch = Dict[int, List[int]]
+
+
+class StockWriteBuffer:
+    """
+    Acumula ajustes de estoque em memória e os grava em lote (write-behind).
+
+    Os ajustes de um mesmo produto são somados e gravados a cada
+    `STOCK_FLUSH_INTERVAL` segundos, ou antes disso quando o número de
+    ajustes pendentes atinge `STOCK_FLUSH_MAX_PENDING`, em uma única
+    transação. Reposições e vendas são somadas separadamente e, para cada
+    produto, a reposição é gravada antes das vendas, de modo que uma venda
+    recusada nunca descarta a reposição.
+
+    Cada ajuste aceito é anexado ao log `STOCK_WRITE_BEHIND_LOG`, obrigatório
+    neste modo, antes de ser confirmado; ajustes simultâneos compartilham o mesmo fsync. O log fica
+    travado com `flock` enquanto o processo vive, então dois processos não
+    podem usar o mesmo arquivo. Na gravação, o log é renomeado com o ID do
+    lote, que é registrado no banco na mesma transação; assim, na recuperação
+    após uma queda, os lotes pendentes são reaplicados exatamente uma vez.
+
+    O estoque nunca fica negativo: o ajuste é recusado se o estoque conhecido
+    somado aos pendentes ficaria negativo, e o UPDATE repete a verificação no
+    banco. Se outro processo alterar o estoque no intervalo, uma venda já
+    aceita (202) pode ser recusada na gravação; nesse caso ela é apenas
+    registrada no log da aplicação e contada em `rows_rejected`.
+    """
+
+    def __init__(self):
+        self.repository = ProductRepository()
+        self._lock = threading.Lock()
+        self._applied = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending: Batch = {}
+        self._pending_count = 0
+        self._known_stock: Dict[int, int] = {}
+        self._applying: frozenset = frozenset()
+        self._generation = 0
+        self._retry: List[Tuple[str, Batch]] = []
+        self._forget: List[str] = []
+        self._log_path: Optional[str] = None
+        self._log_file = None
+        self._lock_file = None
+        self._log_seq = 0
+        self._synced_seq = 0
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self.interval = 0.5
+        self.max_pending = 500
+        self._metrics = {
+            'deltas_received': 0,
+            'log_syncs': 0,
+            'flushes': 0,
+            'failed_flushes': 0,
+            'rows_flushed': 0,
+            'rows_updated': 0,
+            'rows_rejected': 0,
+            'last_batch_size': 0,
+            'max_batch_size': 0,
+            'total_flush_ms': 0.0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+        }
+
+    def init_app(self, app) -> None:
+        """Recupera lotes pendentes do log e inicia a gravação periódica, se habilitado."""
+        if not app.config['STOCK_WRITE_BEHIND_ENABLED']:
+            return
+        # Sem o log, ajustes já confirmados (202) seriam perdidos em uma queda
+        if not app.config['STOCK_WRITE_BEHIND_LOG']:
+            raise RuntimeError('STOCK_WRITE_BEHIND_ENABLED requer STOCK_WRITE_BEHIND_LOG com um arquivo por processo')
+        self.interval = app.config['STOCK_FLUSH_INTERVAL']
+        self.max_pending = app.config['STOCK_FLUSH_MAX_PENDING']
+        self._app = app
+
+        with self._lock:
+            self._log_path = app.config['STOCK_WRITE_BEHIND_LOG']
+            self._acquire_log()
+            self._recover()
+            self._log_file = open(self._log_path, 'a')
+        with app.app_context():
+            self.flush()
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='stock-write-behind', daemon=True)
+            self._thread.start()
+            atexit.register(self._shutdown)
+
+    @property
+    def enabled(self) -> bool:
+        return self._app is not None
+
+    def add(self, product_id: int, delta: int) -> Dict[str, Any]:
+        """Registra um ajuste de estoque para gravação posterior."""
+        while True:
+            with self._lock:
+                stock = self._known_stock.get(product_id)
+                if stock is not None:
+                    result, seq = self._accept(product_id, delta, stock)
+                    break
+                if product_id in self._applying:
+                    # Uma leitura agora poderia ou não incluir o lote em gravação
+                    self._applied.wait()
+                    continue
+                generation = self._generation
+
+            # Consulta fora da trava; descarta a leitura se alguma gravação começou ou terminou no meio
+            stock = self.repository.get_stock(product_id)
+            with self._lock:
+                if generation == self._generation:
+                    self._known_stock.setdefault(product_id, stock)
+
+        self._sync_log(seq)
+        return result
+
+    def flush(self) -> None:
+        """Grava os ajustes pendentes. Requer contexto da aplicação."""
+        with self._flush_lock:
+            with self._sync_lock, self._lock:
+                if self._pending:
+                    batch_id = uuid.uuid4().hex
+                    self._rotate_log(batch_id)
+                    self._retry.append((batch_id, self._pending))
+                    self._pending = {}
+                    self._pending_count = 0
+
+            while True:
+                with self._lock:
+                    if not self._retry:
+                        return
+                    batch_id, batch = self._retry[0]
+                self._apply(batch_id, batch)
+
+    def forget(self, product_id: int) -> None:
+        """Descarta o estoque conhecido de um produto alterado por outro caminho."""
+        with self._lock:
+            self._known_stock.pop(product_id, None)
+            self._generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna as métricas de gravação em lote."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['pending_deltas'] = self._pending_count
+            metrics['pending_products'] = len(self._pending)
+            metrics['retry_batches'] = len(self._retry)
+        flushes = metrics['flushes']
+        metrics['avg_batch_size'] = round(metrics['rows_flushed'] / flushes, 2) if flushes else 0.0
+        metrics['avg_flush_ms'] = round(metrics.pop('total_flush_ms') / flushes, 3) if flushes else 0.0
+        metrics['last_flush_ms'] = round(metrics['last_flush_ms'], 3)
+        metrics['max_flush_ms'] = round(metrics['max_flush_ms'], 3)
+        return {'enabled': self.enabled, 'flush_interval': self.interval,
+                'flush_max_pending': self.max_pending, **metrics}
+
+    def _accept(self, product_id: int, delta: int, stock: int) -> Tuple[Dict[str, Any], int]:
+        # Chamado com a trava. Lotes ainda não confirmados no banco também contam como pendentes
+        in_flight = sum(sum(batch.get(product_id, ())) for _, batch in self._retry)
+        pending = self._pending.get(product_id, (0, 0))
+        expected = stock + in_flight + sum(pending) + delta
+        if expected < 0:
+            raise BadRequestException(f"Estoque insuficiente para o produto com id: {product_id}")
+        if expected > MAX_STOCK_QUANTITY:
+            raise BadRequestException(f"Estoque máximo excedido para o produto com id: {product_id}")
+
+        # O fsync é feito fora da trava, agrupando os ajustes simultâneos
+        self._log_file.write(f"{product_id} {delta}\n")
+        self._log_seq += 1
+        seq = self._log_seq
+        self._pending.setdefault(product_id, [0, 0])[0 if delta > 0 else 1] += delta
+        self._pending_count += 1
+        self._metrics['deltas_received'] += 1
+        if self._pending_count >= self.max_pending:
+            self._wake.set()
+        result = {'id': product_id, 'pending_delta': expected - stock, 'expected_stock': expected}
+        return result, seq
+
+    def _sync_log(self, seq: int) -> None:
+        # Group commit: quem chega primeiro faz o fsync de tudo o que já foi
+        # escrito; os demais encontram seu ajuste já persistido e retornam.
+        with self._sync_lock:
+            if self._synced_seq >= seq:
+                return
+            with self._lock:
+                self._log_file.flush()
+                target = self._log_seq
+                fileno = self._log_file.fileno()
+            os.fsync(fileno)
+            self._synced_seq = target
+            with self._lock:
+                self._metrics['log_syncs'] += 1
+
+    def _apply(self, batch_id: str, batch: Batch) -> None:
+        # Em caso de falha, o lote permanece na fila e é reenviado na próxima gravação
+        adjustments = [(product_id, delta) for product_id in sorted(batch)
+                       for delta in batch[product_id] if delta]
+        with self._lock:
+            self._applying = frozenset(batch)
+            self._generation += 1
+
+        start = time.perf_counter()
+        try:
+            rejected = self.repository.apply_stock_deltas(batch_id, adjustments, self._forget)
+        except Exception:
+            with self._lock:
+                self._metrics['failed_flushes'] += 1
+                self._applying = frozenset()
+                self._generation += 1
+                self._applied.notify_all()
+            raise
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self._forget = [batch_id]
+        os.remove(self._batch_path(batch_id))
+        if rejected:
+            logger.warning('Ajustes de estoque recusados no lote %s: %s', batch_id, rejected)
+
+        with self._lock:
+            self._retry.pop(0)
+            # O estoque conhecido dos produtos do lote volta a ser lido do banco
+            for product_id in batch:
+                self._known_stock.pop(product_id, None)
+            self._applying = frozenset()
+            self._generation += 1
+            self._applied.notify_all()
+            if rejected is None:
+                return
+
+            metrics = self._metrics
+            metrics['flushes'] += 1
+            metrics['rows_flushed'] += len(adjustments)
+            metrics['rows_updated'] += len(adjustments) - len(rejected)
+            metrics['rows_rejected'] += len(rejected)
+            metrics['last_batch_size'] = len(adjustments)
+            metrics['max_batch_size'] = max(metrics['max_batch_size'], len(adjustments))
+            metrics['total_flush_ms'] += elapsed_ms
+            metrics['last_flush_ms'] = elapsed_ms
+            metrics['max_flush_ms'] = max(metrics['max_flush_ms'], elapsed_ms)
+
+    def _batch_path(self, batch_id: str) -> str:
+        return f"{self._log_path}.{batch_id}"
+
+    def _acquire_log(self) -> None:
+        # Chamado com a trava no boot: impede que outro processo vivo use o mesmo log
+        if fcntl is None:
+            raise RuntimeError('STOCK_WRITE_BEHIND_LOG requer fcntl.flock, indisponível nesta plataforma')
+        lock_file = open(f"{self._log_path}.lock", 'a')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise RuntimeError(
+                f"O log de estoque {self._log_path} já está em uso por outro processo; "
+                f"configure um STOCK_WRITE_BEHIND_LOG diferente para cada processo"
+            )
+        self._lock_file = lock_file
+
+    def _rotate_log(self, batch_id: str) -> None:
+        # Chamado com as travas de sync e de estado: o log atual passa a ser o arquivo do lote
+        self._log_file.flush()
+        os.fsync(self._log_file.fileno())
+        self._log_file.close()
+        self._synced_seq = self._log_seq
+        os.replace(self._log_path, self._batch_path(batch_id))
+        self._log_file = open(self._log_path, 'a')
+
+    def _recover(self) -> None:
+        # Chamado com a trava no boot: enfileira os lotes que não foram confirmados
+        if os.path.exists(self._log_path) and os.path.getsize(self._log_path) > 0:
+            os.replace(self._log_path, self._batch_path(uuid.uuid4().hex))
+
+        paths = [path for path in glob.glob(glob.escape(self._log_path) + '.*') if _BATCH_SUFFIX.search(path)]
+        for path in sorted(paths, key=os.path.getmtime):
+            batch_id = _BATCH_SUFFIX.search(path).group(1)
+            batch: Batch = {}
+            with open(path) as log_file:
+                for line in log_file:
+                    parts = line.split()
+                    # Uma linha incompleta é um ajuste que não chegou a ser confirmado
+                    if len(parts) != 2 or not line.endswith('\n'):
+                        continue
+                    product_id, delta = int(parts[0]), int(parts[1])
+                    batch.setdefault(product_id, [0, 0])[0 if delta > 0 else 1] += delta
+            logger.info('Recuperando lote de estoque %s com %d produtos', batch_id, len(batch))
+            self._retry.append((batch_id, batch))
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                with self._app.app_context():
+                    self.flush()
+            except Exception:
+                logger.exception('Falha ao gravar ajustes de estoque; o lote será reenviado')
+
+    def _shutdown(self) -> None:
+        try:
+            with self._app.app_context():
+                self.flush()
+        except Exception:
+            logger.exception('Falha ao gravar ajustes de estoque no encerramento')
+
+
+# Instância compartilhada pela aplicação
+stock_buffer = StockWriteBuffer()
@@ -0,0 +1,204 @@
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Expressões usadas para normalizar instruções em uma "impressão digital"
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|:\w+|\$\d+|%s|\?')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(statement: str) -> str:
+    """Normaliza uma instrução SQL trocando literais e parâmetros por `?`."""
+    normalized = _STRING_LITERAL.sub('?', statement)
+    normalized = _PLACEHOLDER.sub('?', normalized)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _PLACEHOLDER_LIST.sub('(?, ...)', normalized)
+    return _WHITESPACE.sub(' ', normalized).strip()
+
+
+class QueryProfiler:
+    """
+    Perfilador de consultas ligado aos eventos do engine do SQLAlchemy.
+
+    Instruções acima de `SLOW_QUERY_THRESHOLD_MS` são registradas no log com
+    parâmetros, duração e o método do repositório que as originou e, se
+    `QUERY_PROFILER_EXPLAIN` estiver ativo, com o plano de execução, capturado
+    no máximo uma vez por instrução a cada `QUERY_PROFILER_EXPLAIN_INTERVAL`
+    segundos. O agregado por impressão digital exposto em
+    `/api/admin/queries` conta todas as execuções lentas e uma amostra
+    (`QUERY_PROFILER_SAMPLE_RATE`) das demais, cada uma pesando
+    `1 / QUERY_PROFILER_SAMPLE_RATE`; chamadas e tempo total são, portanto,
+    estimativas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self.threshold_ms = 100.0
+        self.sample_rate = 0.1
+        self.explain = False
+        self.explain_interval = 300.0
+        self._explained: Dict[str, float] = {}
+
+    def init_app(self, app) -> None:
+        """Registra os eventos no engine da aplicação, se habilitado."""
+        if not app.config['QUERY_PROFILER_ENABLED']:
+            return
+        self.threshold_ms = app.config['SLOW_QUERY_THRESHOLD_MS']
+        self.sample_rate = app.config['QUERY_PROFILER_SAMPLE_RATE']
+        self.explain = app.config['QUERY_PROFILER_EXPLAIN']
+        self.explain_interval = app.config['QUERY_PROFILER_EXPLAIN_INTERVAL']
+
+        from app import db
+        with app.app_context():
+            engine = db.engine
+        if not event.contains(engine, 'before_cursor_execute', self._before_cursor_execute):
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Retorna o agregado estimado por instrução, da mais custosa para a menos."""
+        with self._lock:
+            rows = [dict(entry, fingerprint=key) for key, entry in self._stats.items()]
+        for row in rows:
+            row['avg_ms'] = round(row['total_ms'] / row['calls'], 3) if row['calls'] else 0.0
+            row['calls'] = round(row['calls'])
+            row['total_ms'] = round(row['total_ms'], 3)
+            row['max_ms'] = round(row['max_ms'], 3)
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def reset(self) -> None:
+        """Descarta o agregado acumulado."""
+        with self._lock:
+            self._stats = {}
+            self._explained = {}
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Guardado no contexto da execução, que é descartado mesmo se a instrução falhar
+        context._query_start_time = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._query_start_time) * 1000
+        slow = elapsed_ms >= self.threshold_ms
+        # Execuções lentas sempre entram no agregado; as demais, por amostragem
+        if slow:
+            weight = 1.0
+        elif random.random() < self.sample_rate:
+            weight = 1.0 / self.sample_rate
+        else:
+            return
+
+        key = fingerprint(statement)
+        self._record(key, elapsed_ms, weight, slow)
+        if slow:
+            self._log_slow_query(conn, key, statement, parameters, elapsed_ms)
+
+    def _record(self, key: str, elapsed_ms: float, weight: float, slow: bool) -> None:
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = {'calls': 0.0, 'total_ms': 0.0, 'max_ms': 0.0, 'slow_calls': 0}
+            entry['calls'] += weight
+            entry['total_ms'] += elapsed_ms * weight
+            if slow:
+                entry['slow_calls'] += 1
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+
+    def _log_slow_query(self, conn, key: str, statement: str, parameters: Any, elapsed_ms: float) -> None:
+        message = 'Consulta lenta (%.1f ms) em %s: %s | parâmetros: %r'
+        args = [elapsed_ms, self._caller(), statement, parameters]
+        plan = self._explain(conn, statement, parameters) if self._should_explain(key) else None
+        if plan:
+            message += '\nPlano:\n%s'
+            args.append(plan)
+        logger.warning(message, *args)
+
+    def _should_explain(self, key: str) -> bool:
+        """Limita a captura do plano, que reexecuta a consulta, a uma por instrução por intervalo."""
+        if not self.explain:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            last = self._explained.get(key)
+            if last is not None and now - last < self.explain_interval:
+                return False
+            self._explained[key] = now
+            return True
+
+    @staticmethod
+    def _caller() -> str:
+        """
+        Localiza o método de repositório que originou a consulta. Consultas
+        disparadas fora dos repositórios (ex.: recarga de atributos expirados
+        após um commit) são atribuídas ao primeiro método da aplicação.
+        """
+        frame = sys._getframe(1)
+        fallback = None
+        while frame is not None:
+            module = frame.f_globals.get('__name__', '')
+            if module.startswith('app.') and module != __name__ and 'self' in frame.f_locals:
+                caller = f"{type(frame.f_locals['self']).__name__}.{frame.f_code.co_name}"
+                if module.startswith('app.repositories'):
+                    return caller
+                fallback = fallback or caller
+            frame = frame.f_back
+        return fallback or 'desconhecido'
+
+    @staticmethod
+    def _explain(conn, statement: str, parameters: Any) -> Optional[str]:
+        """Captura o plano de execução de uma consulta SELECT."""
+        if not statement.lstrip().upper().startswith('SELECT'):
+            return None
+        dialect = conn.dialect.name
+        if dialect == 'postgresql':
+            prefix = 'EXPLAIN (ANALYZE, BUFFERS) '
+        elif dialect == 'sqlite':
+            prefix = 'EXPLAIN QUERY PLAN '
+        else:
+            return None
+
+        # Usa um cursor DBAPI separado para não consumir o resultado original
+        # nem disparar novamente os eventos do engine. No PostgreSQL, um
+        # savepoint evita que uma falha no EXPLAIN aborte a transação corrente.
+        # Nenhuma falha aqui pode chegar à consulta da aplicação.
+        cursor = None
+        savepoint = False
+        try:
+            cursor = conn.connection.dbapi_connection.cursor()
+            if dialect == 'postgresql':
+                cursor.execute('SAVEPOINT query_profiler_explain')
+                savepoint = True
+            cursor.execute(prefix + statement, parameters)
+            plan = '\n'.join(' | '.join(str(column) for column in row) for row in cursor.fetchall())
+            if savepoint:
+                cursor.execute('RELEASE SAVEPOINT query_profiler_explain')
+            return plan
+        except Exception as e:
+            logger.debug('Não foi possível capturar o plano: %s', e)
+            if savepoint:
+                try:
+                    cursor.execute('ROLLBACK TO SAVEPOINT query_profiler_explain')
+                except Exception as rollback_error:
+                    logger.debug('Não foi possível desfazer o savepoint do plano: %s', rollback_error)
+            return None
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
+
+# Instância compartilhada pela aplicação
+query_profiler = QueryProfiler()
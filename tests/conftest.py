@@ -0,0 +1,31 @@
+import pytest
+
+from app import create_app, db
+from app.config import TestingConfig
+from app.models.product import Product
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Aplicação de teste com um banco SQLite isolado por teste."""
+    monkeypatch.setenv('APP_SETTINGS', 'app.config.TestingConfig')
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'produto_test.db'}")
+    app = create_app()
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def product(app):
+    """Produto com 10 unidades em estoque."""
+    product = Product(name='Camiseta', price=50.0, stock_quantity=10, category='roupas')
+    db.session.add(product)
+    db.session.commit()
+    return product
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+from itertools import product as combinations
+
+import pytest
+
+from app import db
+from app.models.product import Product
+from app.repositories.catalog_snapshot import CatalogSnapshot, catalog_snapshot
+from app.repositories.product_repository import ProductRepository
+
+
+@pytest.fixture
+def catalog(app):
+    """Catálogo com empates de preço e de `updated_at` e estoques zerados ou nulos."""
+    base = datetime(2024, 1, 1)
+    for i in range(60):
+        product = Product(name=f'Item {i:02d}', price=float(i % 7) * 5,
+                          stock_quantity=[0, 3, None, 8][i % 4], category='abc'[i % 3])
+        product.updated_at = base + timedelta(minutes=i % 5)
+        db.session.add(product)
+    db.session.commit()
+
+
+@pytest.fixture
+def snapshot(app, catalog):
+    snapshot = CatalogSnapshot()
+    snapshot.load()
+    return snapshot
+
+
+def ids(entries):
+    return [entry.id for entry in entries]
+
+
+@pytest.mark.parametrize('sort,descending', combinations(['id', 'price', 'updated_at'], [False, True]))
+def test_find_by_filters_matches_repository(snapshot, sort, descending):
+    repository = ProductRepository()
+    shapes = combinations([None, 'a', 'z'], [(None, None), (10, 20), (0, 0)],
+                          [None, True, False], [(0, 7), (5, 7), (0, 100)])
+    for category, (min_price, max_price), in_stock, (offset, limit) in shapes:
+        filters = dict(category=category, min_price=min_price, max_price=max_price, in_stock=in_stock,
+                       sort=sort, descending=descending, limit=limit, offset=offset)
+        assert ids(snapshot.find_by_filters(**filters)) == ids(repository.find_by_filters(**filters)), filters
+
+
+def test_refresh_overlap_picks_up_late_committed_row(snapshot):
+    product = Product.query.order_by(Product.id).first()
+    # Outro processo grava um horário anterior à marca d'água, mas confirma depois
+    late = snapshot._watermark - timedelta(seconds=2)
+    db.session.execute(db.update(Product).where(Product.id == product.id).values(price=999.0, updated_at=late))
+    db.session.commit()
+
+    snapshot.refresh()
+    assert snapshot.get(product.id).price != 999.0
+
+    snapshot.refresh(overlap=5)
+    assert snapshot.get(product.id).price == 999.0
+    assert ids(snapshot.find_by_filters(min_price=999, sort='price')) == [product.id]
+
+
+def test_refresh_reloads_when_count_diverges(snapshot):
+    product = Product.query.order_by(Product.id).first()
+    db.session.execute(db.delete(Product).where(Product.id == product.id))
+    db.session.commit()
+
+    snapshot.refresh()
+
+    assert snapshot.get(product.id) is None
+    assert snapshot.count() == 59
+    assert product.id not in ids(snapshot.find_by_filters(limit=100))
+
+
+def test_upsert_and_remove_keep_indexes_consistent(snapshot):
+    product = Product.query.filter_by(category='a').order_by(Product.id).first()
+    product.price = 1000.0
+    product.category = 'b'
+    db.session.commit()
+
+    snapshot.upsert(product)
+    assert ids(snapshot.find_by_filters(sort='price', descending=True, limit=1)) == [product.id]
+    assert product.id not in ids(snapshot.find_by_filters(category='a', limit=100))
+    assert ids(snapshot.find_by_filters(category='b', sort='price', descending=True, limit=1)) == [product.id]
+
+    snapshot.remove(product.id)
+    assert product.id not in ids(snapshot.find_by_filters(sort='price', limit=100))
+    assert snapshot.find_by_name_prefix(product.name) == []
+
+
+def test_find_by_name_prefix(snapshot):
+    assert [entry.name for entry in snapshot.find_by_name_prefix('item 1')] == [f'Item 1{i}' for i in range(10)]
+    assert snapshot.find_by_name_prefix('nada') == []
+
+
+@pytest.mark.parametrize('snapshot_enabled', [False, True])
+def test_prefix_endpoint(app, client, catalog, snapshot_enabled):
+    app.config['CATALOG_SNAPSHOT_ENABLED'] = snapshot_enabled
+    db.session.add(Product(name='50% off', price=1.0))
+    db.session.commit()
+    if snapshot_enabled:
+        catalog_snapshot.load()
+
+    names = [item['name'] for item in client.get('/api/products/prefix/ITEM 5').get_json()]
+    assert names == [f'Item 5{i}' for i in range(10)]
+    # Curingas do LIKE são comparados literalmente
+    assert client.get('/api/products/prefix/%').get_json() == []
+    assert [item['name'] for item in client.get('/api/products/prefix/50%25').get_json()] == ['50% off']
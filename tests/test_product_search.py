@@ -0,0 +1,81 @@
+import pytest
+
+from app import db
+from app.models.product import Product
+
+
+@pytest.fixture
+def catalog(app):
+    stocks = [0, 4, 1, 9, 2]
+    for i in range(12):
+        db.session.add(Product(name=f'Item {i}', price=float(12 - i), stock_quantity=stocks[i % 5],
+                               category='ab'[i % 2]))
+    db.session.commit()
+    # Linhas antigas podem ter estoque nulo, tratado como sem estoque
+    db.session.execute(db.update(Product).where(Product.stock_quantity == 1).values(stock_quantity=None))
+    db.session.commit()
+
+
+def search(client, **params):
+    return client.get('/api/products/search', query_string=params)
+
+
+@pytest.mark.parametrize('params', [
+    {'sort': 'name'},
+    {'order': 'up'},
+    {'limit': 0},
+    {'offset': -1},
+    {'min_price': 5, 'max_price': 2, 'category': 'a'},
+    {'min_price': 5},
+    {'max_price': 5, 'sort': 'updated_at'},
+])
+def test_invalid_parameters_are_rejected(client, catalog, params):
+    response = search(client, **params)
+
+    assert response.status_code == 400
+    assert 'message' in response.get_json()
+
+
+def test_offset_is_capped(app, client, catalog):
+    app.config['PRODUCT_QUERY_MAX_OFFSET'] = 10
+
+    assert search(client, offset=10).status_code == 200
+    assert search(client, offset=11).status_code == 400
+
+
+def test_limit_is_capped(app, client, catalog):
+    app.config['PRODUCT_QUERY_MAX_LIMIT'] = 5
+
+    page = search(client, limit=1000).get_json()
+
+    assert page['limit'] == 5
+    assert len(page['items']) == 5
+
+
+def test_next_offset_walks_every_page(client, catalog):
+    seen, offset = [], 0
+    while offset is not None:
+        page = search(client, sort='price', order='desc', limit=5, offset=offset).get_json()
+        seen.extend(item['id'] for item in page['items'])
+        offset = page['next_offset']
+
+    assert seen == [product.id for product in Product.query.order_by(Product.price.desc(), Product.id.desc())]
+
+
+def test_in_stock_filter(client, catalog):
+    in_stock = search(client, in_stock='true', limit=100).get_json()['items']
+    out_of_stock = search(client, in_stock='false', limit=100).get_json()['items']
+
+    assert in_stock and all(item['stock_quantity'] > 0 for item in in_stock)
+    assert {item['stock_quantity'] for item in out_of_stock} == {0, None}
+    assert len(in_stock) + len(out_of_stock) == 12
+
+
+def test_category_price_range_sorted_by_updated_at(client, catalog):
+    items = search(client, category='a', min_price=3, max_price=10, in_stock='true',
+                   sort='updated_at').get_json()['items']
+
+    assert items
+    assert all(item['category'] == 'a' and 3 <= item['price'] <= 10 and item['stock_quantity'] > 0
+               for item in items)
+    assert [item['updated_at'] for item in items] == sorted(item['updated_at'] for item in items)
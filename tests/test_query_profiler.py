@@ -0,0 +1,105 @@
+import logging
+from itertools import cycle
+from types import SimpleNamespace
+
+import pytest
+
+from app import db
+from app.repositories.product_repository import ProductRepository
+from app.utils import query_profiler as profiler_module
+from app.utils.query_profiler import QueryProfiler, fingerprint
+
+
+@pytest.fixture
+def start_profiler(app):
+    def start(**config):
+        app.config.update(QUERY_PROFILER_ENABLED=True, SLOW_QUERY_THRESHOLD_MS=0,
+                          QUERY_PROFILER_SAMPLE_RATE=0, QUERY_PROFILER_EXPLAIN=False)
+        app.config.update(config)
+        profiler = QueryProfiler()
+        profiler.init_app(app)
+        return profiler
+
+    yield start
+    # Os eventos ficam no engine do banco do teste, descartado ao final
+    db.engine.dispose()
+
+
+def by_fingerprint(profiler, text):
+    return next(row for row in profiler.stats() if text in row['fingerprint'])
+
+
+def test_fingerprint_normalises_literals_and_parameters():
+    assert fingerprint("SELECT * FROM products WHERE name = 'O''Neil' AND price > 10.5") == \
+        'SELECT * FROM products WHERE name = ? AND price > ?'
+    assert fingerprint('SELECT *\n  FROM products\n WHERE id = :id_1 AND category = %(category)s') == \
+        'SELECT * FROM products WHERE id = ? AND category = ?'
+    assert fingerprint('SELECT * FROM products WHERE id IN (?, ?, ?)') == \
+        fingerprint('SELECT * FROM products WHERE id IN (1, 2)') == \
+        'SELECT * FROM products WHERE id IN (?, ...)'
+
+
+def test_slow_query_is_logged_with_caller_and_plan_once(start_profiler, product, caplog):
+    start_profiler(QUERY_PROFILER_EXPLAIN=True)
+    repository = ProductRepository()
+
+    with caplog.at_level(logging.WARNING, logger=profiler_module.__name__):
+        repository.find_by_name('Cami')
+        repository.find_by_name('Outro')
+
+    messages = [record.getMessage() for record in caplog.records if 'LIKE' in record.getMessage()]
+    assert len(messages) == 2
+    assert all('em ProductRepository.find_by_name:' in message for message in messages)
+    assert "('%Cami%',)" in messages[0]
+    # O plano é capturado uma única vez por instrução dentro do intervalo
+    assert ['Plano:' in message for message in messages] == [True, False]
+
+
+def test_slow_calls_always_count_towards_aggregate(start_profiler, product):
+    profiler = start_profiler()
+    repository = ProductRepository()
+
+    for _ in range(3):
+        repository.count()
+
+    row = by_fingerprint(profiler, 'count(')
+    assert row['calls'] == row['slow_calls'] == 3
+    assert row['total_ms'] > 0
+    assert row['avg_ms'] > 0
+
+
+def test_sampled_fast_calls_are_scaled_by_sample_rate(start_profiler, product, monkeypatch):
+    profiler = start_profiler(SLOW_QUERY_THRESHOLD_MS=10 ** 6, QUERY_PROFILER_SAMPLE_RATE=0.25)
+    draws = cycle([0.1, 0.9, 0.9, 0.9])
+    monkeypatch.setattr(profiler_module.random, 'random', lambda: next(draws))
+    repository = ProductRepository()
+
+    for _ in range(8):
+        repository.count()
+
+    row = by_fingerprint(profiler, 'count(')
+    assert row['calls'] == 8
+    assert row['slow_calls'] == 0
+
+
+def test_always_slow_statement_sorts_first():
+    profiler = QueryProfiler()
+    profiler._record('SELECT lenta', 50.0, 1.0, True)
+    profiler._record('SELECT rapida', 1.0, 2.0, False)
+
+    assert [row['fingerprint'] for row in profiler.stats()] == ['SELECT lenta', 'SELECT rapida']
+
+
+def test_explain_failures_never_reach_the_application():
+    class FailingCursor:
+        def execute(self, *args):
+            raise RuntimeError('SAVEPOINT fora de uma transação')
+
+        def close(self):
+            raise RuntimeError('cursor já fechado')
+
+    dbapi_connection = SimpleNamespace(cursor=FailingCursor)
+    conn = SimpleNamespace(dialect=SimpleNamespace(name='postgresql'),
+                           connection=SimpleNamespace(dbapi_connection=dbapi_connection))
+
+    assert QueryProfiler._explain(conn, 'SELECT 1', ()) is None
@@ -0,0 +1,142 @@
+import atexit
+import os
+
+import pytest
+
+from app import db
+from app.models.product import Product
+from app.repositories.product_repository import ProductRepository
+from app.services.stock_buffer import StockWriteBuffer
+from app.utils.exceptions import BadRequestException
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / 'stock_deltas.log')
+
+
+@pytest.fixture
+def start_buffer(app, log_path):
+    """Inicia buffers com gravação periódica desligada; os testes chamam flush()."""
+    started = []
+
+    def start():
+        app.config.update(
+            STOCK_WRITE_BEHIND_ENABLED=True,
+            STOCK_WRITE_BEHIND_LOG=log_path,
+            STOCK_FLUSH_INTERVAL=3600,
+            STOCK_FLUSH_MAX_PENDING=10 ** 6,
+        )
+        buffer = StockWriteBuffer()
+        buffer.init_app(app)
+        started.append(buffer)
+        return buffer
+
+    yield start
+    for buffer in started:
+        crash(buffer)
+
+
+def crash(buffer):
+    """Simula a queda do processo: nada é gravado e a trava do log é liberada."""
+    atexit.unregister(buffer._shutdown)
+    if buffer._log_file is not None:
+        buffer._log_file.close()
+    if buffer._lock_file is not None:
+        buffer._lock_file.close()
+
+
+def stock_of(product):
+    return ProductRepository().get_stock(product.id)
+
+
+def leftover_logs(log_path):
+    directory, name = os.path.split(log_path)
+    return [entry for entry in os.listdir(directory)
+            if entry.startswith(name + '.') and not entry.endswith('.lock')]
+
+
+def test_deltas_are_recovered_after_crash_before_flush(start_buffer, product, log_path):
+    buffer = start_buffer()
+    buffer.add(product.id, -3)
+    buffer.add(product.id, 5)
+    crash(buffer)
+    assert stock_of(product) == 10
+
+    start_buffer()
+
+    assert stock_of(product) == 12
+    assert leftover_logs(log_path) == []
+
+
+def test_batch_committed_before_log_removal_is_not_reapplied(start_buffer, product, log_path):
+    buffer = start_buffer()
+    buffer.add(product.id, -3)
+    apply_stock_deltas = buffer.repository.apply_stock_deltas
+
+    def commit_then_crash(*args, **kwargs):
+        apply_stock_deltas(*args, **kwargs)
+        raise RuntimeError('queda entre o commit e a remoção do log')
+
+    buffer.repository.apply_stock_deltas = commit_then_crash
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+    crash(buffer)
+    assert stock_of(product) == 7
+    assert len(leftover_logs(log_path)) == 1
+
+    start_buffer()
+
+    assert stock_of(product) == 7
+    assert leftover_logs(log_path) == []
+
+
+def test_sale_beyond_known_stock_is_rejected(start_buffer, product):
+    buffer = start_buffer()
+
+    with pytest.raises(BadRequestException):
+        buffer.add(product.id, -11)
+    buffer.add(product.id, -10)
+    with pytest.raises(BadRequestException):
+        buffer.add(product.id, -1)
+
+    buffer.flush()
+    assert stock_of(product) == 0
+
+
+def test_sale_rejected_at_flush_keeps_restock(start_buffer, product):
+    buffer = start_buffer()
+    buffer.add(product.id, -8)
+    buffer.add(product.id, 3)
+
+    # Outro processo zera o estoque antes da gravação
+    db.session.execute(db.update(Product).where(Product.id == product.id).values(stock_quantity=0))
+    db.session.commit()
+    buffer.flush()
+
+    assert stock_of(product) == 3
+    stats = buffer.stats()
+    assert stats['rows_updated'] == 1
+    assert stats['rows_rejected'] == 1
+
+
+def test_log_in_use_by_another_process_fails_fast(start_buffer):
+    start_buffer()
+
+    with pytest.raises(RuntimeError, match='já está em uso'):
+        start_buffer()
+
+
+def test_delta_out_of_range_is_bad_request(client, product):
+    response = client.post(f'/api/products/{product.id}/stock', json={'delta': 10 ** 30})
+
+    assert response.status_code == 400
+
+
+def test_write_behind_without_log_fails_fast(app):
+    app.config.update(STOCK_WRITE_BEHIND_ENABLED=True, STOCK_WRITE_BEHIND_LOG='')
+    buffer = StockWriteBuffer()
+
+    with pytest.raises(RuntimeError, match='STOCK_WRITE_BEHIND_LOG'):
+        buffer.init_app(app)
+    assert not buffer.enabled